@@ -1,5 +1,8 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from numba import njit
+from pyarrow import csv as pacsv
 
 """Telemetry analysis utilities.
 
@@ -31,68 +34,279 @@ REQUIRED_COLUMNS = [
 ]
 
 
+# Per-sample input channels stored as float32
+FLOAT32_COLUMNS = ["speed", "throttle", "brake", "steering"]
+
+# Column types enforced at parse time by the Arrow CSV reader.
+# lap is float64 so values written as e.g. "1.0" still parse.
+# track_position stays float64: segment bucketing is sensitive to rounding
+# for samples sitting exactly on a segment boundary.
+COLUMN_TYPES = {
+    "timestamp": pa.float64(),
+    "lap": pa.float64(),
+    "speed": pa.float32(),
+    "throttle": pa.float32(),
+    "brake": pa.float32(),
+    "steering": pa.float32(),
+    "track_position": pa.float64(),
+}
+
+
 def load_data(path_or_buffer) -> pd.DataFrame:
-    """Load telemetry data from a CSV file or file-like object."""
-    return pd.read_csv(path_or_buffer)
+    """Load telemetry data from a CSV file or file-like object.
+
+    Raises pyarrow.ArrowInvalid if the input cannot be parsed as CSV.
+    """
+    read_options = pacsv.ReadOptions(use_threads=True)
+    is_file = hasattr(path_or_buffer, "read")
+    start = path_or_buffer.tell() if is_file and path_or_buffer.seekable() else None
+    try:
+        table = pacsv.read_csv(
+            path_or_buffer,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(column_types=COLUMN_TYPES),
+        )
+    except pa.ArrowInvalid:
+        # Some cell doesn't parse as its enforced type (e.g. "abc" in speed).
+        # Re-read the required columns as plain strings (no type inference,
+        # which would e.g. turn ISO timestamps into datetimes) and let
+        # prepare_telemetry() coerce anything non-numeric to NaN.
+        if is_file:
+            if start is None:
+                raise
+            path_or_buffer.seek(start)
+        table = pacsv.read_csv(
+            path_or_buffer,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(
+                column_types={c: pa.string() for c in REQUIRED_COLUMNS}
+            ),
+        )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def prepare_telemetry(
+    df: pd.DataFrame,
+    n_segments: int = 4,
+    max_dt: float | None = None,
+) -> pd.DataFrame:
+    """Validate, clean, segment and compute dt in a single pass.
 
+    Returns a new frame sorted by (lap, timestamp) with the required columns
+    plus an integer `segment` index and `dt`, keeping only rows with a valid
+    dt (positive and optionally under max_dt).  The input frame is not
+    modified.
+    """
+    if n_segments < 1:
+        raise ValueError(f"n_segments must be at least 1, got {n_segments}")
 
-def validate_and_clean(df: pd.DataFrame) -> pd.DataFrame:
-    """Validate columns, coerce types, clip common ranges, and sort."""
     missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
-    # Coerce numeric columns
+    cols = {}
     for c in REQUIRED_COLUMNS:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
-
-    df = df.dropna(subset=["timestamp", "lap", "track_position"])  # essential columns
-
+        col = df[c]
+        # Types are enforced when parsing via load_data(); only coerce columns
+        # that arrived as non-numeric (e.g. frames built elsewhere).
+        if not pd.api.types.is_numeric_dtype(col):
+            col = pd.to_numeric(col, errors="coerce")
+        # Driver inputs only need single precision; halves memory traffic downstream.
+        # timestamp and track_position keep float64 (dt and segment boundaries).
+        dtype = np.float32 if c in FLOAT32_COLUMNS else None
+        cols[c] = col.to_numpy(dtype=dtype)
+
+    ts = cols["timestamp"].astype(np.float64, copy=False)
+    lap = cols["lap"]
+    pos = cols["track_position"].astype(np.float64, copy=False)
+
+    # Essential columns, then sort for correct dt computation
+    valid = ~(np.isnan(ts) | np.isnan(lap) | np.isnan(pos))
+    rows = np.flatnonzero(valid)
+    rows = rows[np.lexsort((ts[rows], lap[rows]))]
+
+    ts = ts[rows]
+    lap = lap[rows]
     # Clip common ranges
-    df["track_position"] = df["track_position"].clip(0.0, 1.0)
-    df["throttle"] = df["throttle"].clip(0.0, 1.0)
-    df["brake"] = df["brake"].clip(0.0, 1.0)
-
-    # Sort for correct dt computation
-    df = df.sort_values(["lap", "timestamp"]).reset_index(drop=True)
-    return df
-
-
-def assign_segment(pos: float, n_segments: int = 4) -> str:
-    """Determine which segment a given track position belongs to."""
-    if pos is None or pd.isna(pos) or pos < 0:
-        return "S1"
-
-    seg_length = 1.0 / n_segments
-    seg_idx = int(pos / seg_length)
-    if seg_idx >= n_segments:
-        seg_idx = n_segments - 1
-    return f"S{seg_idx + 1}"
-
-
-def add_segments(df: pd.DataFrame, n_segments: int = 4) -> pd.DataFrame:
-    """Add a `segment` column based on track_position."""
-    df = df.copy()
-    df["segment"] = df["track_position"].apply(lambda p: assign_segment(p, n_segments))
-    return df
-
+    pos = np.clip(pos[rows], 0.0, 1.0)
+    throttle = np.clip(cols["throttle"][rows], 0.0, 1.0)
+    brake = np.clip(cols["brake"][rows], 0.0, 1.0)
+
+    # dt within each lap; the first sample of a lap has no predecessor
+    dt = np.empty_like(ts)
+    if len(ts):
+        dt[0] = np.nan
+        np.subtract(ts[1:], ts[:-1], out=dt[1:])
+        dt[1:][lap[1:] != lap[:-1]] = np.nan
+
+    # NaN compares False, so missing dt is dropped as well
+    keep = dt > 0
+    if max_dt is not None:
+        keep &= dt <= max_dt
+
+    # Zero-based segment index from normalized track position; labels
+    # (S1..Sn) are only attached to the final output
+    pos = pos[keep]
+    seg_idx = np.minimum((pos * n_segments).astype(np.int64), n_segments - 1)
+    seg_dtype = np.int8 if n_segments <= np.iinfo(np.int8).max else np.int32
+
+    return pd.DataFrame(
+        {
+            "timestamp": ts[keep],
+            "lap": lap[keep],
+            "speed": cols["speed"][rows][keep],
+            "throttle": throttle[keep],
+            "brake": brake[keep],
+            "steering": cols["steering"][rows][keep],
+            "track_position": pos,
+            "segment": seg_idx.astype(seg_dtype),
+            "dt": dt[keep],
+        },
+        copy=False,
+    )
 
-def compute_deltas(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute dt within each lap."""
-    df = df.copy()
-    df = df.sort_values(["lap", "timestamp"]).reset_index(drop=True)
-    df["dt"] = df.groupby("lap")["timestamp"].diff()
-    return df
 
+@njit(cache=True)
+def _segment_kernel(
+    starts,
+    ends,
+    dt,
+    brake,
+    throttle,
+    speed,
+    brake_threshold,
+    throttle_threshold,
+    out_seg,
+    out_brake,
+    out_throttle,
+    out_coast,
+    out_entry,
+    out_exit,
+    out_delay,
+    out_avg_speed,
+    out_avg_throttle,
+    out_avg_brake,
+):
+    """Per-group timing + driver-input heuristics over contiguous sample ranges.
+
+    Group k covers samples ``starts[k]:ends[k]``, already ordered by timestamp.
+    Inputs may be float32; all sums are accumulated in float64 locals.
+    """
+    for k in range(starts.shape[0]):
+        s = starts[k]
+        e = ends[k]
+
+        seg_dt = 0.0
+        brake_dt = 0.0
+        throttle_dt = 0.0
+        coast_dt = 0.0
+        speed_sum = 0.0
+        speed_n = 0
+        throttle_sum = 0.0
+        throttle_n = 0
+        brake_sum = 0.0
+        brake_n = 0
+
+        # Apex proxy: first sample with the minimum speed within the segment.
+        apex = -1
+        apex_speed = np.inf
+        entry_dt = 0.0
+
+        for i in range(s, e):
+            d = dt[i]
+            seg_dt += d
+
+            is_braking = brake[i] >= brake_threshold
+            is_throttle = throttle[i] >= throttle_threshold
+            if is_braking:
+                brake_dt += d
+            if is_throttle:
+                throttle_dt += d
+            if not (is_braking or is_throttle):
+                coast_dt += d
+
+            v = speed[i]
+            if not np.isnan(v):
+                speed_sum += v
+                speed_n += 1
+                if apex < 0 or v < apex_speed:
+                    apex = i
+                    apex_speed = v
+                    # Entry = start -> min speed (inclusive)
+                    entry_dt = seg_dt
+            if not np.isnan(throttle[i]):
+                throttle_sum += throttle[i]
+                throttle_n += 1
+            if not np.isnan(brake[i]):
+                brake_sum += brake[i]
+                brake_n += 1
+
+        out_seg[k] = seg_dt
+        out_brake[k] = brake_dt
+        out_throttle[k] = throttle_dt
+        out_coast[k] = coast_dt
+        out_avg_speed[k] = speed_sum / speed_n if speed_n > 0 else np.nan
+        out_avg_throttle[k] = throttle_sum / throttle_n if throttle_n > 0 else np.nan
+        out_avg_brake[k] = brake_sum / brake_n if brake_n > 0 else np.nan
+
+        if e - s < 2 or apex < 0:
+            out_entry[k] = np.nan
+            out_exit[k] = np.nan
+            out_delay[k] = np.nan
+            continue
 
-def clean_deltas(df: pd.DataFrame, max_dt: float | None = None) -> pd.DataFrame:
-    """Keep only valid dt values (positive and optionally under max_dt)."""
-    df = df.copy()
-    df = df.dropna(subset=["dt"])
-    df = df[df["dt"] > 0]
-    if max_dt is not None:
-        df = df[df["dt"] <= max_dt]
-    return df
+        # Exit (powered) = throttle re-application -> end of segment.
+        # Throttle delay = just after apex up to and including the first
+        # throttle-on sample.  If throttle never comes back, all remaining
+        # time is "delay" and the powered exit is 0.
+        delay_dt = 0.0
+        exit_dt = 0.0
+        powered = False
+        for i in range(apex + 1, e):
+            if powered:
+                exit_dt += dt[i]
+                continue
+            delay_dt += dt[i]
+            if throttle[i] >= throttle_threshold:
+                powered = True
+                exit_dt += dt[i]
+
+        out_entry[k] = entry_dt
+        out_exit[k] = exit_dt
+        out_delay[k] = delay_dt
+
+
+def warmup_numba() -> None:
+    """Compile the Numba kernel ahead of the first request.
+
+    Runs the kernel on a tiny synthetic lap with the same argument types
+    prepare_telemetry() produces, so the compiled signatures are
+    materialized (and cached to disk) before any real analysis.  Columns
+    read straight from a frame are read-only (copy-on-write) while
+    reordered ones are writable; each is a separate Numba signature.
+    """
+    n = 4
+    starts = np.array([0], dtype=np.intp)
+    ends = np.array([n], dtype=np.intp)
+    for writeable in (True, False):
+        dt = np.full(n, 0.05)
+        brake = np.array([0.5, 0.2, 0.0, 0.0], dtype=np.float32)
+        throttle = np.array([0.0, 0.1, 0.3, 0.8], dtype=np.float32)
+        speed = np.array([150.0, 110.0, 120.0, 140.0], dtype=np.float32)
+        for a in (dt, brake, throttle, speed):
+            a.setflags(write=writeable)
+        outs = [np.empty(1) for _ in range(10)]
+        _segment_kernel(
+            starts,
+            ends,
+            dt,
+            brake,
+            throttle,
+            speed,
+            np.float32(0.15),
+            np.float32(0.25),
+            *outs,
+        )
 
 
 def _per_lap_segment_metrics(
@@ -102,71 +316,89 @@ def _per_lap_segment_metrics(
 ) -> pd.DataFrame:
     """Compute per-lap/per-segment timing + driver-input heuristics."""
 
-    df = df.copy()
-    df["is_braking"] = df["brake"] >= brake_threshold
-    df["is_throttle"] = df["throttle"] >= throttle_threshold
-    df["is_coast"] = ~(df["is_braking"] | df["is_throttle"])
-
-    rows: list[dict] = []
-
-    for (lap, seg), g in df.groupby(["lap", "segment"], sort=False):
-        g = g.sort_values("timestamp")
-
-        seg_dt = float(g["dt"].sum())
-        brake_dt = float(g.loc[g["is_braking"], "dt"].sum())
-        throttle_dt = float(g.loc[g["is_throttle"], "dt"].sum())
-        coast_dt = float(g.loc[g["is_coast"], "dt"].sum())
-
-        # Apex proxy: minimum speed within the segment.
-        # Entry = start -> min speed.
-        # Exit (powered) = throttle re-application -> end of segment.
-        # Throttle delay = min speed -> throttle re-application.
-        if len(g) >= 2 and g["speed"].notna().any():
-            g2 = g.reset_index(drop=True)
-
-            apex_pos = int(g2["speed"].idxmin())
-            entry_dt = float(g2.loc[:apex_pos, "dt"].sum())
-
-            after_apex = g2.loc[apex_pos + 1 :]
-            if after_apex.empty:
-                exit_throttle_delay_dt = 0.0
-                exit_dt = 0.0
-            else:
-                throttle_on_pos = after_apex.index[after_apex["is_throttle"]]
-                if len(throttle_on_pos) == 0:
-                    # Never got back on throttle in this segment after the apex.
-                    # Treat all remaining time as "delay" and 0 powered exit.
-                    exit_throttle_delay_dt = float(after_apex["dt"].sum())
-                    exit_dt = 0.0
-                else:
-                    first_on = int(throttle_on_pos[0])
-                    # Delay includes time from just after apex up to and including first throttle-on sample.
-                    exit_throttle_delay_dt = float(g2.loc[apex_pos + 1 : first_on, "dt"].sum())
-                    # Powered exit time starts at throttle re-application.
-                    exit_dt = float(g2.loc[first_on:, "dt"].sum())
-        else:
-            entry_dt = np.nan
-            exit_dt = np.nan
-            exit_throttle_delay_dt = np.nan
-
-        rows.append(
-            {
-                "lap": int(lap),
-                "segment": str(seg),
-                "seg_dt": seg_dt,
-                "brake_dt": brake_dt,
-                "throttle_dt": throttle_dt,
-                "coast_dt": coast_dt,
-                "entry_dt": entry_dt,
-                "exit_dt": exit_dt,
-                "exit_throttle_delay_dt": exit_throttle_delay_dt,
-                "avg_speed": float(g["speed"].mean()),
-                "avg_throttle": float(g["throttle"].mean()),
-                "avg_brake": float(g["brake"].mean()),
-            }
-        )
+    # Input is sorted by (lap, timestamp) in prepare_telemetry.  Groups are
+    # normally already contiguous since track_position increases through a
+    # lap; only reorder (stably, keeping timestamp order) when it doesn't.
+    lap = df["lap"].to_numpy()
+    seg_code = df["segment"].to_numpy()
+    dt = df["dt"].to_numpy(dtype=np.float64)
+    brake = df["brake"].to_numpy()
+    throttle = df["throttle"].to_numpy()
+    speed = df["speed"].to_numpy()
+
+    n = len(df)
+    same_lap = lap[1:] == lap[:-1]
+    if not np.all(~same_lap | (seg_code[1:] >= seg_code[:-1])):
+        order = np.lexsort((seg_code, lap))
+        lap = lap[order]
+        seg_code = seg_code[order]
+        dt = dt[order]
+        brake = brake[order]
+        throttle = throttle[order]
+        speed = speed[order]
+
+    change = np.empty(n, dtype=np.bool_)
+    if n:
+        change[0] = True
+        change[1:] = (lap[1:] != lap[:-1]) | (seg_code[1:] != seg_code[:-1])
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], n)
+
+    n_groups = len(starts)
+    seg_dt = np.empty(n_groups)
+    brake_dt = np.empty(n_groups)
+    throttle_dt = np.empty(n_groups)
+    coast_dt = np.empty(n_groups)
+    entry_dt = np.empty(n_groups)
+    exit_dt = np.empty(n_groups)
+    exit_throttle_delay_dt = np.empty(n_groups)
+    avg_speed = np.empty(n_groups)
+    avg_throttle = np.empty(n_groups)
+    avg_brake = np.empty(n_groups)
+
+    # Compare in the channel's own precision so a sample written as exactly
+    # the threshold (e.g. 0.35 stored as float32) still counts as on
+    brake_threshold = brake.dtype.type(brake_threshold)
+    throttle_threshold = throttle.dtype.type(throttle_threshold)
+
+    _segment_kernel(
+        starts,
+        ends,
+        dt,
+        brake,
+        throttle,
+        speed,
+        brake_threshold,
+        throttle_threshold,
+        seg_dt,
+        brake_dt,
+        throttle_dt,
+        coast_dt,
+        entry_dt,
+        exit_dt,
+        exit_throttle_delay_dt,
+        avg_speed,
+        avg_throttle,
+        avg_brake,
+    )
 
-    return pd.DataFrame(rows)
+    return pd.DataFrame(
+        {
+            "lap": lap[starts].astype(np.int64),
+            "segment": seg_code[starts],
+            "seg_dt": seg_dt,
+            "brake_dt": brake_dt,
+            "throttle_dt": throttle_dt,
+            "coast_dt": coast_dt,
+            "entry_dt": entry_dt,
+            "exit_dt": exit_dt,
+            "exit_throttle_delay_dt": exit_throttle_delay_dt,
+            "avg_speed": avg_speed,
+            "avg_throttle": avg_throttle,
+            "avg_brake": avg_brake,
+        },
+        copy=False,
+    )
 
 
 def analyse_telemetry(
@@ -178,10 +410,7 @@ def analyse_telemetry(
 ) -> pd.DataFrame:
     """Full analysis pipeline returning ranked bottlenecks with useful breakdowns."""
 
-    df = validate_and_clean(df)
-    df = add_segments(df, n_segments=n_segments)
-    df = compute_deltas(df)
-    df = clean_deltas(df, max_dt=max_dt)
+    df = prepare_telemetry(df, n_segments=n_segments, max_dt=max_dt)
 
     per_lap = _per_lap_segment_metrics(
         df,
@@ -223,32 +452,33 @@ def analyse_telemetry(
     # Baseline: choose ONE best lap per segment by overall segment time.
     # This keeps component losses comparable to total time_loss.
     baseline_idx = per_lap.groupby("segment")["seg_dt"].idxmin()
-    baseline = per_lap.loc[baseline_idx, [
-        "segment",
-        "seg_dt",
-        "brake_dt",
-        "exit_dt",
-        "exit_throttle_delay_dt",
-        "entry_dt",
-    ]].rename(
-        columns={
-            "seg_dt": "best_dt",
-            "brake_dt": "best_brake_dt",
-            "exit_dt": "best_exit_dt",
-            "exit_throttle_delay_dt": "best_exit_throttle_delay_dt",
-            "entry_dt": "best_entry_dt",
-        }
-    )
-
-    out = avg.merge(baseline, on="segment", how="left")
+    baseline = per_lap.loc[baseline_idx].set_index("segment")
+
+    # One baseline row per segment: plain dict lookups instead of a merge
+    out = avg
+    for src, dst in [
+        ("seg_dt", "best_dt"),
+        ("brake_dt", "best_brake_dt"),
+        ("exit_dt", "best_exit_dt"),
+        ("exit_throttle_delay_dt", "best_exit_throttle_delay_dt"),
+        ("entry_dt", "best_entry_dt"),
+    ]:
+        out[dst] = out["segment"].map(baseline[src].to_dict())
 
     # Overall time loss
     out["time_loss"] = out["avg_dt"] - out["best_dt"]
-    out["loss_percent"] = np.where(
-        out["best_dt"] > 0,
-        (out["time_loss"] / out["best_dt"]) * 100.0,
-        np.nan,
+    # Only divide where there is a positive baseline; other lanes stay NaN
+    best_dt = out["best_dt"].to_numpy(dtype=np.float64)
+    loss_percent = np.full(len(out), np.nan)
+    has_baseline = best_dt > 0
+    np.divide(
+        out["time_loss"].to_numpy(dtype=np.float64),
+        best_dt,
+        out=loss_percent,
+        where=has_baseline,
     )
+    loss_percent[has_baseline] *= 100.0
+    out["loss_percent"] = loss_percent
 
     # Actionable breakdown
     out["brake_time_loss"] = out["avg_brake_dt"] - out["best_brake_dt"]
@@ -269,25 +499,25 @@ def analyse_telemetry(
         out[c] = out[c].where(out[c] > 1e-9, 0.0)
 
     # Explain the biggest positive contributor
-    def _top_cause(row) -> str:
-        candidates = {
-            "braking": row.get("brake_time_loss", 0.0),
-            "corner_exit": row.get("exit_time_loss", 0.0),
-            "corner_exit (late throttle)": row.get("exit_throttle_delay_loss", 0.0),
-        }
-        best_label = max(
-            candidates,
-            key=lambda k: candidates[k] if pd.notna(candidates[k]) else -np.inf,
-        )
-        if pd.isna(candidates[best_label]) or candidates[best_label] <= 1e-6:
-            return "n/a"
-        return best_label
-
-    out["top_cause"] = out.apply(_top_cause, axis=1)
+    causes = out[
+        ["brake_time_loss", "exit_time_loss", "exit_throttle_delay_loss"]
+    ].to_numpy(dtype=np.float64)
+    causes = np.where(np.isnan(causes), -np.inf, causes)
+    labels = np.array(["braking", "corner_exit", "corner_exit (late throttle)", "n/a"])
+    top = causes.argmax(axis=1)
+    top[causes.max(axis=1) <= 1e-6] = len(labels) - 1
+    out["top_cause"] = labels[top]
 
     # Keep a backwards-compatible alias for older frontend code
     out["loss"] = out["time_loss"]
 
+    out["segment"] = "S" + (out["segment"].astype(int) + 1).astype(str)
+
     # Rank
     out = out.sort_values("time_loss", ascending=False).reset_index(drop=True)
+
+    # Millisecond-level precision is plenty for reporting; float32 halves
+    # the serialized size of every numeric field
+    num_cols = out.select_dtypes("float64").columns
+    out[num_cols] = out[num_cols].astype(np.float32)
     return out
\ No newline at end of file
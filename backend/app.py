@@ -1,6 +1,9 @@
-from flask import Flask, request, jsonify
+import orjson
+import pandas as pd
+import pyarrow as pa
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from analyzer import load_data, analyse_telemetry
+from analyzer import load_data, analyse_telemetry, warmup_numba
 
 
 def create_app():
@@ -16,6 +19,9 @@ def create_app():
     # Enable CORS for all routes.  This is useful when running the
     # frontend from a file:// origin during local development.
     CORS(app)
+    # Compile the analysis kernel now so the first /analyze request
+    # doesn't pay the JIT cost.
+    warmup_numba()
 
     @app.route("/analyze", methods=["POST"])
     def analyze():
@@ -33,7 +39,8 @@ def create_app():
         Returns
         -------
         flask.Response
-            JSON array of segment analysis records.
+            JSON object mapping each result column to its list of values,
+            one entry per segment in ranked order.
         """
         if "file" not in request.files:
             return jsonify({"error": "Missing file"}), 400
@@ -44,6 +51,8 @@ def create_app():
             n_segments = int(n_segments_raw)
         except (TypeError, ValueError):
             n_segments = 4
+        if n_segments < 1:
+            n_segments = 4
 
         # Optional thresholds (for useful loss breakdown)
         brake_raw = request.form.get("brake_threshold", 0.15)
@@ -68,7 +77,10 @@ def create_app():
 
         # Load data into DataFrame
         # Using `file.stream` is the most reliable across Flask/Werkzeug versions
-        df = load_data(file.stream)
+        try:
+            df = load_data(file.stream)
+        except pa.ArrowInvalid as exc:
+            return jsonify({"error": f"Could not parse CSV: {exc}"}), 400
 
         # Run analysis (now returns useful fields like brake_time_loss and exit_time_loss)
         result_df = analyse_telemetry(
@@ -78,9 +90,14 @@ def create_app():
             brake_threshold=brake_threshold,
             throttle_threshold=throttle_threshold,
         )
-        # Convert result into JSON serialisable format
-        data = result_df.to_dict(orient="records")
-        return jsonify(data)
+        # Serialise column-wise; numeric columns go to orjson as NumPy arrays
+        # (no per-cell boxing, NaN becomes null)
+        columns = {
+            k: v.to_numpy() if pd.api.types.is_numeric_dtype(v) else v.tolist()
+            for k, v in result_df.items()
+        }
+        payload = orjson.dumps(columns, option=orjson.OPT_SERIALIZE_NUMPY)
+        return Response(payload, mimetype="application/json")
 
     return app
 
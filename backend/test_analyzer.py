@@ -0,0 +1,48 @@
+import io
+
+import pytest
+
+from analyzer import analyse_telemetry, load_data
+
+HEADER = "timestamp,lap,speed,throttle,brake,steering,track_position\n"
+
+# One lap, two samples per segment, dt = 0.05 s
+NUMERIC_ROWS = "".join(
+    f"{i * 0.05:.2f},1,150,0.7,0.2,0.0,{i / 8:.3f}\n" for i in range(8)
+)
+
+ISO_ROWS = "".join(
+    f"2024-01-01T00:00:{i * 0.05:06.3f},1,150,0.7,0.2,0.0,{i / 8:.3f}\n"
+    for i in range(8)
+)
+
+
+def _sources(text, tmp_path):
+    """The same CSV as a path and as a seekable stream."""
+    path = tmp_path / "telemetry.csv"
+    path.write_text(text)
+    return [str(path), io.BytesIO(text.encode())]
+
+
+def test_iso_timestamps_are_not_parsed_as_datetimes(tmp_path):
+    # Non-numeric timestamps become NaN and every row is dropped
+    for src in _sources(HEADER + ISO_ROWS, tmp_path):
+        df = load_data(src)
+        assert analyse_telemetry(df).empty
+
+
+def test_non_numeric_cell_is_coerced_to_nan(tmp_path):
+    text = HEADER + NUMERIC_ROWS.replace(",150,", ",abc,", 1)
+    for src in _sources(text, tmp_path):
+        df = load_data(src)
+        out = analyse_telemetry(df)
+        assert len(out) == 4
+        # 7 valid dt samples (the lap's first sample has none)
+        assert out["avg_dt"].sum() == pytest.approx(0.35, abs=1e-6)
+
+
+def test_n_segments_must_be_positive():
+    df = load_data(io.BytesIO((HEADER + NUMERIC_ROWS).encode()))
+    for n in (0, -3):
+        with pytest.raises(ValueError):
+            analyse_telemetry(df, n_segments=n)
@@ -25,6 +25,24 @@ function formatNumber(value, decimals = 3) {
   return n.toFixed(decimals);
 }
 
+/**
+ * Convert the column-oriented API response into an array of row objects.
+ *
+ * @param {Object<string, Array>} columns Mapping of column name to values.
+ * @returns {Array<Object>} One object per segment, in the returned order.
+ */
+function columnsToRows(columns) {
+  const names = Object.keys(columns || {});
+  if (names.length === 0) return [];
+  return columns[names[0]].map((_, i) => {
+    const row = {};
+    names.forEach((name) => {
+      row[name] = columns[name][i];
+    });
+    return row;
+  });
+}
+
 /**
  * Render the analysis table with the given data.
  *
@@ -142,7 +160,7 @@ async function handleAnalyse() {
       const text = await response.text();
       throw new Error(`Server error: ${response.status} - ${text}`);
     }
-    const data = await response.json();
+    const data = columnsToRows(await response.json());
     renderTable(data);
     renderChart(data);
   } catch (err) {
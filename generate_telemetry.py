@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 import argparse
+from pyarrow import csv as pacsv
 
 """
 Generates large, realistic fake telemetry for Lap Time Bottleneck Finder
@@ -28,9 +30,6 @@ def main():
 
     rng = np.random.default_rng(args.seed)
 
-    ROWS = []
-    timestamp = 0.0
-
     LAPS = args.laps
     POINTS_PER_LAP = args.points
 
@@ -41,6 +40,24 @@ def main():
         (0.55, 0.65),   # big hairpin
         (0.78, 0.86)
     ]
+    corner_starts = np.array([c[0] for c in CORNERS])
+    corner_ends = np.array([c[1] for c in CORNERS])
+
+    # Track position is the same for every lap; find which corner (if any)
+    # each sample falls in. Corners don't overlap and both bounds are inclusive.
+    pos = np.arange(POINTS_PER_LAP) / POINTS_PER_LAP
+    corner_idx = np.searchsorted(corner_starts, pos, side="right") - 1
+    in_corner = corner_idx >= 0
+    in_corner[in_corner] = pos[in_corner] <= corner_ends[corner_idx[in_corner]]
+    corner_idx[~in_corner] = -1
+
+    c_start = corner_starts[corner_idx]
+    c_end = corner_ends[corner_idx]
+    corner_len = c_end - c_start
+    midpoint = (c_start + c_end) / 2
+    after_apex = in_corner & (pos > midpoint)
+
+    cols = {name: [] for name in ["dt", "lap", "speed", "throttle", "brake", "steering"]}
 
     for lap in range(1, LAPS + 1):
         # Pick lap's primary weakness type
@@ -48,92 +65,75 @@ def main():
         weak_exit_corner = rng.choice(len(CORNERS))
         weak_brake_corner = rng.choice(len(CORNERS))
 
-        for i in range(POINTS_PER_LAP):
-            pos = i / POINTS_PER_LAP
-            # Base timestep ~22 Hz
-            dt = 0.045 + rng.normal(0, 0.002)
-            speed = rng.normal(155, 4)
-            throttle = np.clip(rng.normal(0.75, 0.1), 0, 1)
-            brake = np.clip(rng.normal(0.05, 0.05), 0, 1)
-            steering = rng.normal(0, 0.15)
-
-            for idx, (c_start, c_end) in enumerate(CORNERS):
-                if c_start <= pos <= c_end:
-                    # Simulate corner behavior
-                    speed -= 40
-                    throttle *= 0.55
-                    brake += 0.4
-                    steering += rng.normal(0.4, 0.1)
-
-                    corner_len = (c_end - c_start)
-                    midpoint = (c_start + c_end) / 2
-                    entry_end = c_start + 0.25 * corner_len    # first 25% = braking/entry
-                    exit_start = c_end - 0.25 * corner_len     # last 25% = exit/traction
-
-                    # Exit phase base behaviour (normal laps): start re-applying throttle after apex.
-                    # We want most laps to go ABOVE the analyzer throttle threshold (default 0.25)
-                    # shortly after the midpoint, otherwise the analyzer will always flag "late throttle".
-                    if pos > midpoint:
-                        # Normal exit: throttle comes back up.
-                        throttle = max(throttle, 0.60)
-
-                        # Release brake on exit for most laps, but for braking-weak laps
-                        # we keep a little extra brake longer (this makes brake_time_loss win sometimes).
-                        if weakness == "braking" and idx == weak_brake_corner:
-                            brake = min(brake, 0.22)
-                        else:
-                            brake = min(brake, 0.10)
-
-                    # --- Weakness injections ---
-                    # 1) Braking-dominant lap: bigger dt hit, but only early in the corner
-                    entry_end_strong = c_start + 0.40 * corner_len  # first 40% of corner
-                    if weakness == "braking" and idx == weak_brake_corner and c_start <= pos <= entry_end_strong:
-                        dt += 0.060
-
-                    # 2) Exit-dominant lap: dt hit only in the last quarter of the corner
-                    exit_start_tight = c_end - 0.15 * corner_len  # last 15% only
-                    if weakness == "exit" and idx == weak_exit_corner and exit_start_tight <= pos <= c_end:
-                        dt += 0.020
-
-                    # 3) Late throttle lap: keep throttle low after apex until later, and add a small dt hit
-                    if weakness == "late_throttle" and idx == weak_exit_corner and pos > midpoint:
-                        # Keep throttle BELOW the analyzer threshold for most of the exit,
-                        # but keep the dt penalty modest so this shows up primarily as
-                        # exit_throttle_delay_loss (not always as the biggest exit_time_loss).
-                        delay_release = c_end - 0.12 * corner_len  # release throttle in last ~12% of corner
-                        if pos < delay_release:
-                            throttle = min(throttle, 0.12)  # < 0.25
-                            brake = min(brake, 0.08)
-                            dt += 0.012
-                        else:
-                            throttle = max(throttle, 0.70)
-                            brake = min(brake, 0.05)
-
-            timestamp += dt
-            ROWS.append([
-                timestamp,
-                lap,
-                speed,
-                throttle,
-                brake,
-                steering,
-                pos
-            ])
+        # Base timestep ~22 Hz
+        dt = 0.045 + rng.normal(0, 0.002, POINTS_PER_LAP)
+        speed = rng.normal(155, 4, POINTS_PER_LAP)
+        throttle = np.clip(rng.normal(0.75, 0.1, POINTS_PER_LAP), 0, 1)
+        brake = np.clip(rng.normal(0.05, 0.05, POINTS_PER_LAP), 0, 1)
+        steering = rng.normal(0, 0.15, POINTS_PER_LAP)
+
+        # Simulate corner behavior
+        speed[in_corner] -= 40
+        throttle[in_corner] *= 0.55
+        brake[in_corner] += 0.4
+        steering[in_corner] += rng.normal(0.4, 0.1, int(in_corner.sum()))
+
+        # Exit phase base behaviour (normal laps): start re-applying throttle after apex.
+        # We want most laps to go ABOVE the analyzer throttle threshold (default 0.25)
+        # shortly after the midpoint, otherwise the analyzer will always flag "late throttle".
+        throttle[after_apex] = np.maximum(throttle[after_apex], 0.60)
+
+        # Release brake on exit for most laps, but for braking-weak laps
+        # we keep a little extra brake longer (this makes brake_time_loss win sometimes).
+        weak_brake = corner_idx == weak_brake_corner
+        exit_brake_cap = np.where((weakness == "braking") & weak_brake, 0.22, 0.10)
+        brake[after_apex] = np.minimum(brake[after_apex], exit_brake_cap[after_apex])
+
+        # --- Weakness injections ---
+        if weakness == "braking":
+            # 1) Braking-dominant lap: bigger dt hit, but only early in the corner
+            entry_end_strong = c_start + 0.40 * corner_len  # first 40% of corner
+            dt[weak_brake & (pos >= c_start) & (pos <= entry_end_strong)] += 0.060
+        elif weakness == "exit":
+            # 2) Exit-dominant lap: dt hit only in the last quarter of the corner
+            exit_start_tight = c_end - 0.15 * corner_len  # last 15% only
+            dt[(corner_idx == weak_exit_corner) & (pos >= exit_start_tight) & (pos <= c_end)] += 0.020
+        else:
+            # 3) Late throttle lap: keep throttle BELOW the analyzer threshold for most
+            # of the exit, but keep the dt penalty modest so this shows up primarily as
+            # exit_throttle_delay_loss (not always as the biggest exit_time_loss).
+            weak_exit = (corner_idx == weak_exit_corner) & after_apex
+            delay_release = c_end - 0.12 * corner_len  # release throttle in last ~12% of corner
+            held = weak_exit & (pos < delay_release)
+            released = weak_exit & ~held
+            throttle[held] = np.minimum(throttle[held], 0.12)  # < 0.25
+            brake[held] = np.minimum(brake[held], 0.08)
+            dt[held] += 0.012
+            throttle[released] = np.maximum(throttle[released], 0.70)
+            brake[released] = np.minimum(brake[released], 0.05)
+
+        cols["dt"].append(dt)
+        cols["lap"].append(np.full(POINTS_PER_LAP, lap))
+        cols["speed"].append(speed)
+        cols["throttle"].append(throttle)
+        cols["brake"].append(brake)
+        cols["steering"].append(steering)
+
+    cols = {name: np.concatenate(parts) for name, parts in cols.items()}
 
     df = pd.DataFrame(
-        ROWS,
-        columns=[
-            "timestamp",
-            "lap",
-            "speed",
-            "throttle",
-            "brake",
-            "steering",
-            "track_position"
-        ]
+        {
+            "timestamp": np.cumsum(cols["dt"]),
+            "lap": cols["lap"],
+            "speed": cols["speed"],
+            "throttle": cols["throttle"],
+            "brake": cols["brake"],
+            "steering": cols["steering"],
+            "track_position": np.tile(pos, LAPS),
+        }
     )
 
-    df.to_csv(args.out, index=False)
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), args.out)
     print(f"✅ Created {args.out}")
     print(f"Rows: {len(df)}")
     print(f"Laps: {LAPS}")